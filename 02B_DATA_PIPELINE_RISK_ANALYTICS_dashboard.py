@@ -2,11 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import plotly.figure_factory as ff
+import plotly.io as pio
 from datetime import datetime
-import time
-import json
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from snowflake.snowpark.context import get_active_session
 
 # Insurance Workshop Risk Analytics Dashboard
@@ -32,8 +30,46 @@ COLORS = {
     'purple_moon': '#7254A3'     # Purple Moon
 }
 
-# Professional styling with Snowflake branding
-st.markdown(f"""
+# Risk level palette shared by every risk-level-coloured chart
+RISK_LEVEL_COLORS = {
+    'HIGH': COLORS['first_light'],
+    'MEDIUM': COLORS['valencia_orange'],
+    'LOW': COLORS['star_blue']
+}
+
+# Broker tier palette shared by every tier-coloured chart
+BROKER_TIER_COLORS = {
+    'PLATINUM': COLORS['purple_moon'],
+    'GOLD': COLORS['valencia_orange'],
+    'SILVER': COLORS['medium_gray'],
+    'BRONZE': COLORS['first_light']
+}
+
+# Python UDF performance tier palette
+PERFORMANCE_TIER_COLORS = {
+    'ELITE': COLORS['purple_moon'],
+    'SUPERIOR': COLORS['star_blue'],
+    'PROFICIENT': COLORS['valencia_orange'],
+    'DEVELOPING': COLORS['first_light']
+}
+
+# Continuous colour scales: risk runs blue to pink, performance (higher is better) the reverse
+RISK_GRADIENT = [[0, COLORS['star_blue']], [0.5, COLORS['valencia_orange']], [1, COLORS['first_light']]]
+PERFORMANCE_GRADIENT = [[0, COLORS['first_light']], [0.5, COLORS['valencia_orange']], [1, COLORS['star_blue']]]
+
+# Shared figure theme, layered on the Plotly default so builders only set per-chart layout;
+# charts render with theme=None so Streamlit's own theme does not replace it
+pio.templates['snowflake'] = go.layout.Template(layout=dict(
+    title=dict(font=dict(color=COLORS['mid_blue'])),
+    height=400,
+    colorway=[COLORS['main'], COLORS['star_blue'], COLORS['valencia_orange'], COLORS['purple_moon']]
+))
+pio.templates.default = 'plotly+snowflake'
+
+@st.cache_resource
+def get_dashboard_css() -> str:
+    """Build the branded <style> block once per server process"""
+    return f"""
 <style>
     .main-header {{
         color: {COLORS['midnight']};
@@ -71,6 +107,11 @@ st.markdown(f"""
         margin: 15px 0;
         box-shadow: 0 4px 8px rgba(0,0,0,0.1);
     }}
+    .card-grid {{
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 16px;
+    }}
     .udf-analysis {{ 
         background-color: #f0f8ff;
         padding: 15px;
@@ -80,110 +121,249 @@ st.markdown(f"""
         color: {COLORS['medium_gray']};
     }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def get_static_html() -> dict:
+    """Pre-render the constant notes and footer once per server process"""
+    return {
+        'udf_note': (
+            '<div class="udf-analysis">'
+            '<strong>Mixed UDF Architecture:</strong> This dashboard showcases both SQL UDFs (CALCULATE_CUSTOMER_RISK_SCORE, DETERMINE_BROKER_TIER) '
+            'and Python UDFs (ANALYZE_BROKER_PERFORMANCE) working together in Dynamic Tables for real-time analytics.'
+            '</div>'
+        ),
+        'footer': (
+            f"<div style='text-align: center; color: {COLORS['medium_gray']}; padding: 20px;'>"
+            '<p><strong>Insurance Workshop - Risk Analytics Intelligence Dashboard</strong></p>'
+            '<p>Powered by Snowflake Dynamic Tables, SQL UDFs, and Python UDFs</p>'
+            '<p>UDF-Driven Analytics • Geographic Intelligence • Broker Performance • Real-time Insights</p>'
+            '</div>'
+        )
+    }
+
+STATIC_HTML = get_static_html()
+
+# Professional styling with Snowflake branding
+st.markdown(get_dashboard_css(), unsafe_allow_html=True)
+
+@st.cache_resource
+def get_session():
+    """Resolve the active Snowflake session once and share it across reruns"""
+    return get_active_session()
 
 # Get active Snowflake session
-session = get_active_session()
+session = get_session()
+
+# Risk analytics queries, keyed by the result set each one populates
+RISK_ANALYTICS_QUERIES = {
+    # Portfolio-wide overview metrics, reduced to a single row server-side
+    'risk_overview': """
+        SELECT 
+            COUNT(*) as TOTAL_CUSTOMERS,
+            COUNT_IF(FINAL_RISK_LEVEL = 'HIGH') as HIGH_RISK_COUNT,
+            COUNT_IF(FINAL_RISK_LEVEL = 'MEDIUM') as MEDIUM_RISK_COUNT,
+            COUNT_IF(FINAL_RISK_LEVEL = 'LOW') as LOW_RISK_COUNT,
+            AVG(CUSTOMER_RISK_SCORE) as AVG_RISK_SCORE,
+            SUM(CLAIM_AMOUNT_FILLED) as TOTAL_EXPOSURE
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        WHERE BROKER_ID IS NOT NULL
+    """,
+    # Broker portfolio aggregates for the risk correlation charts
+    'broker_correlation': """
+        SELECT 
+            BROKER_ID,
+            BROKER_TIER,
+            BROKER_CUSTOMER_COUNT,
+            COUNT(*) as MANAGED_CUSTOMERS,
+            AVG(CUSTOMER_RISK_SCORE) as PORTFOLIO_RISK_SCORE,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_CUSTOMERS,
+            AVG(POLICY_ANNUAL_PREMIUM) as AVG_PORTFOLIO_PREMIUM,
+            SUM(CLAIM_AMOUNT_FILLED) as TOTAL_PORTFOLIO_CLAIMS
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        WHERE BROKER_ID IS NOT NULL
+        GROUP BY BROKER_ID, BROKER_TIER, BROKER_CUSTOMER_COUNT
+    """,
+    # Customer risk profile aggregations
+    'risk_profiles': """
+        SELECT 
+            CUSTOMER_SEGMENT,
+            CUSTOMER_REGION,
+            COUNT(*) as CUSTOMER_COUNT,
+            AVG(CUSTOMER_RISK_SCORE) as AVG_RISK_SCORE,
+            AVG(POLICY_ANNUAL_PREMIUM) as AVG_PREMIUM,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_COUNT,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'MEDIUM' THEN 1 END) as MEDIUM_RISK_COUNT,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'LOW' THEN 1 END) as LOW_RISK_COUNT,
+            SUM(CLAIM_AMOUNT_FILLED) as TOTAL_CLAIMS
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        GROUP BY CUSTOMER_SEGMENT, CUSTOMER_REGION
+    """,
+    # Customers per five-year age band and risk level, binned server-side for the age histogram
+    'age_distribution': """
+        SELECT 
+            FLOOR(AGE / 5) * 5 as AGE_BAND,
+            FINAL_RISK_LEVEL,
+            COUNT(*) as CUSTOMER_COUNT
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        WHERE BROKER_ID IS NOT NULL
+          AND AGE IS NOT NULL
+        GROUP BY AGE_BAND, FINAL_RISK_LEVEL
+    """,
+    # Premium quartiles per risk level for the premium box plot
+    'premium_quartiles': """
+        SELECT 
+            FINAL_RISK_LEVEL,
+            MIN(POLICY_ANNUAL_PREMIUM) as MIN_PREMIUM,
+            APPROX_PERCENTILE(POLICY_ANNUAL_PREMIUM, 0.25) as Q1_PREMIUM,
+            APPROX_PERCENTILE(POLICY_ANNUAL_PREMIUM, 0.5) as MEDIAN_PREMIUM,
+            APPROX_PERCENTILE(POLICY_ANNUAL_PREMIUM, 0.75) as Q3_PREMIUM,
+            MAX(POLICY_ANNUAL_PREMIUM) as MAX_PREMIUM
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        WHERE BROKER_ID IS NOT NULL
+        GROUP BY FINAL_RISK_LEVEL
+    """,
+    # Segment-level rollup for the segment risk scatter
+    'segment_rollup': """
+        SELECT 
+            CUSTOMER_SEGMENT,
+            COUNT(*) as CUSTOMER_COUNT,
+            AVG(CUSTOMER_RISK_SCORE) as AVG_RISK_SCORE,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_COUNT
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        GROUP BY CUSTOMER_SEGMENT
+    """,
+    # Customers per broker tier, aggregated server-side for the tier chart
+    'tier_distribution': """
+        SELECT 
+            BROKER_TIER,
+            COUNT(*) as CUSTOMER_COUNT
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        WHERE BROKER_ID IS NOT NULL
+        GROUP BY BROKER_TIER
+        ORDER BY CUSTOMER_COUNT DESC
+    """,
+    # Geographic risk distribution
+    'geographic_risk': """
+        SELECT 
+            CUSTOMER_REGION,
+            COUNT(*) as TOTAL_CUSTOMERS,
+            AVG(CUSTOMER_RISK_SCORE) as REGION_AVG_RISK,
+            COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_COUNT,
+            COUNT(DISTINCT BROKER_ID) as ACTIVE_BROKERS,
+            AVG(POLICY_ANNUAL_PREMIUM) as REGION_AVG_PREMIUM,
+            SUM(CLAIM_AMOUNT_FILLED) as REGION_TOTAL_CLAIMS,
+            ROUND(AVG(CUSTOMER_RISK_SCORE), 1) as RISK_SCORE_ROUNDED
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
+        GROUP BY CUSTOMER_REGION
+        ORDER BY REGION_AVG_RISK DESC
+    """,
+    # Broker performance matrix with the Python UDF OBJECT flattened server-side
+    'broker_matrix': """
+        SELECT 
+            BROKER_ID,
+            BROKER_FIRST_NAME || ' ' || BROKER_LAST_NAME as BROKER_NAME,
+            TOTAL_CUSTOMERS,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:total_score::FLOAT, 0) as TOTAL_SCORE,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:performance_tier::STRING, 'UNKNOWN') as PERFORMANCE_TIER,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:satisfaction_component::FLOAT, 0) as SATISFACTION_COMPONENT,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:experience_component::FLOAT, 0) as EXPERIENCE_COMPONENT,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:training_component::FLOAT, 0) as TRAINING_COMPONENT,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:portfolio_component::FLOAT, 0) as PORTFOLIO_COMPONENT,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:risk_management_component::FLOAT, 0) as RISK_MANAGEMENT_COMPONENT
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.BROKER_PERFORMANCE_MATRIX
+        WHERE BROKER_ACTIVE = TRUE
+          AND BROKER_PERFORMANCE_ANALYSIS IS NOT NULL
+    """,
+    # Ten highest Python UDF scores, ranked server-side for the top performers table
+    'top_brokers': """
+        SELECT 
+            BROKER_FIRST_NAME || ' ' || BROKER_LAST_NAME as BROKER_NAME,
+            COALESCE(BROKER_PERFORMANCE_ANALYSIS:performance_tier::STRING, 'UNKNOWN') as PERFORMANCE_TIER,
+            ROUND(COALESCE(BROKER_PERFORMANCE_ANALYSIS:total_score::FLOAT, 0), 1) as TOTAL_SCORE,
+            TOTAL_CUSTOMERS
+        FROM INSURANCE_WORKSHOP_DB.ANALYTICS.BROKER_PERFORMANCE_MATRIX
+        WHERE BROKER_ACTIVE = TRUE
+          AND BROKER_PERFORMANCE_ANALYSIS IS NOT NULL
+        QUALIFY ROW_NUMBER() OVER (ORDER BY BROKER_PERFORMANCE_ANALYSIS:total_score::FLOAT DESC NULLS LAST) <= 10
+        ORDER BY TOTAL_SCORE DESC
+    """
+}
+
+def downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink int64 count columns to the smallest integer dtype that holds them"""
+    for column in df.select_dtypes('int64').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+# Low-cardinality label columns stored as categoricals for cheaper counts and groupbys;
+# columns with a fixed UDF vocabulary get an ordered dtype matching their palette
+ORDERED_CATEGORY_COLUMNS = {
+    'BROKER_TIER': pd.CategoricalDtype(list(BROKER_TIER_COLORS), ordered=True),
+    'FINAL_RISK_LEVEL': pd.CategoricalDtype(list(RISK_LEVEL_COLORS), ordered=True),
+    'PERFORMANCE_TIER': pd.CategoricalDtype([*PERFORMANCE_TIER_COLORS, 'UNKNOWN'], ordered=True)
+}
+CATEGORY_COLUMNS = ('CUSTOMER_SEGMENT', 'CUSTOMER_REGION')
+
+def as_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert label columns present in a fetched frame to category dtype"""
+    for column, dtype in ORDERED_CATEGORY_COLUMNS.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+@st.cache_data(ttl=30)
+def get_data_watermark():
+    """Latest refresh time of the source Dynamic Tables, or None when the metadata probe can't tell"""
+    try:
+        # MAX(LAST_ALTERED) is NULL when the role cannot see the tables in INFORMATION_SCHEMA
+        return session.sql("""
+            SELECT MAX(LAST_ALTERED)
+            FROM INSURANCE_WORKSHOP_DB.INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = 'ANALYTICS'
+              AND TABLE_NAME IN ('RISK_INTELLIGENCE_DASHBOARD', 'BROKER_PERFORMANCE_MATRIX')
+        """).collect()[0][0]
+    except Exception:
+        return None
 
-@st.cache_data(ttl=60)
-def get_risk_analytics_data():
-    """Fetch comprehensive risk analytics from Dynamic Tables and UDFs"""
+@st.cache_data(ttl=600)
+def get_risk_analytics_data(watermark, role):
+    """Fetch comprehensive risk analytics from Dynamic Tables and UDFs.
+    
+    Both arguments only key the cache. The watermark refetches results as soon
+    as the Dynamic Tables refresh rather than on a fixed timer; the role keeps
+    BROKER_PERFORMANCE_MATRIX masking and row access results from being shared
+    across roles, while users of the same role share one entry.
+    """
     
     try:
         results = {}
         
-        # Risk intelligence dashboard with corrected column names
-        results['risk_dashboard'] = session.sql("""
-            SELECT 
-                POLICY_NUMBER,
-                AGE,
-                CUSTOMER_SEGMENT,
-                CUSTOMER_RISK_SCORE,
-                POLICY_ANNUAL_PREMIUM,
-                CLAIM_AMOUNT_FILLED,
-                CUSTOMER_REGION,
-                BROKER_ID,
-                BROKER_TIER,
-                BROKER_CUSTOMER_COUNT,
-                BROKER_AVG_CLAIM,
-                FINAL_RISK_LEVEL,
-                BROKER_PERFORMANCE_ANALYSIS,
-                INSURED_SEX,
-                INSURED_OCCUPATION,
-                HAS_CLAIM,
-                FRAUD_REPORTED_FILLED
-            FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
-            WHERE BROKER_ID IS NOT NULL
-        """).to_pandas()
-        
-        # Customer risk profile aggregations
-        results['risk_profiles'] = session.sql("""
-            SELECT 
-                CUSTOMER_SEGMENT,
-                CUSTOMER_REGION,
-                COUNT(*) as CUSTOMER_COUNT,
-                AVG(CUSTOMER_RISK_SCORE) as AVG_RISK_SCORE,
-                AVG(POLICY_ANNUAL_PREMIUM) as AVG_PREMIUM,
-                COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_COUNT,
-                COUNT(CASE WHEN FINAL_RISK_LEVEL = 'MEDIUM' THEN 1 END) as MEDIUM_RISK_COUNT,
-                COUNT(CASE WHEN FINAL_RISK_LEVEL = 'LOW' THEN 1 END) as LOW_RISK_COUNT,
-                SUM(CLAIM_AMOUNT_FILLED) as TOTAL_CLAIMS
-            FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
-            GROUP BY CUSTOMER_SEGMENT, CUSTOMER_REGION
-        """).to_pandas()
+        # Independent queries run concurrently; Streamlit calls stay on the script thread.
+        # Each statement is tagged with its result key so QUERY_HISTORY can attribute load
+        with ThreadPoolExecutor(max_workers=len(RISK_ANALYTICS_QUERIES)) as executor:
+            futures = {
+                executor.submit(
+                    lambda query=query, key=key: session.sql(query).to_pandas(
+                        statement_params={'QUERY_TAG': f'risk_analytics_dashboard:{key}'}
+                    )
+                ): key
+                for key, query in RISK_ANALYTICS_QUERIES.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = as_categories(downcast_integers(future.result()))
+                except Exception as e:
+                    st.warning(f"Could not fetch {key.replace('_', ' ')}: {str(e)}")
         
-        # Broker correlation analysis with correct column names
-        results['broker_correlation'] = session.sql("""
-            SELECT 
-                BROKER_ID,
-                BROKER_TIER,
-                BROKER_CUSTOMER_COUNT,
-                BROKER_AVG_CLAIM,
-                COUNT(*) as MANAGED_CUSTOMERS,
-                AVG(CUSTOMER_RISK_SCORE) as PORTFOLIO_RISK_SCORE,
-                COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_CUSTOMERS,
-                AVG(POLICY_ANNUAL_PREMIUM) as AVG_PORTFOLIO_PREMIUM,
-                SUM(CLAIM_AMOUNT_FILLED) as TOTAL_PORTFOLIO_CLAIMS,
-                MAX(CUSTOMER_REGION) as PRIMARY_REGION,
-                ANY_VALUE(BROKER_PERFORMANCE_ANALYSIS) as BROKER_PERFORMANCE_ANALYSIS
-            FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
-            WHERE BROKER_ID IS NOT NULL
-            GROUP BY BROKER_ID, BROKER_TIER, BROKER_CUSTOMER_COUNT, BROKER_AVG_CLAIM
-        """).to_pandas()
-        
-        # Geographic risk distribution
-        results['geographic_risk'] = session.sql("""
-            SELECT 
-                CUSTOMER_REGION,
-                COUNT(*) as TOTAL_CUSTOMERS,
-                AVG(CUSTOMER_RISK_SCORE) as REGION_AVG_RISK,
-                COUNT(CASE WHEN FINAL_RISK_LEVEL = 'HIGH' THEN 1 END) as HIGH_RISK_COUNT,
-                COUNT(DISTINCT BROKER_ID) as ACTIVE_BROKERS,
-                AVG(POLICY_ANNUAL_PREMIUM) as REGION_AVG_PREMIUM,
-                SUM(CLAIM_AMOUNT_FILLED) as REGION_TOTAL_CLAIMS,
-                ROUND(AVG(CUSTOMER_RISK_SCORE), 1) as RISK_SCORE_ROUNDED
-            FROM INSURANCE_WORKSHOP_DB.ANALYTICS.RISK_INTELLIGENCE_DASHBOARD
-            GROUP BY CUSTOMER_REGION
-            ORDER BY REGION_AVG_RISK DESC
-        """).to_pandas()
-        
-        # Broker performance matrix aggregated data
-        results['broker_matrix'] = session.sql("""
-            SELECT 
-                BROKER_ID,
-                BROKER_FIRST_NAME,
-                BROKER_LAST_NAME,
-                BROKER_TIER,
-                TOTAL_CUSTOMERS,
-                AVG_CUSTOMER_PREMIUM,
-                AVG_CUSTOMER_RISK,
-                TOTAL_PREMIUM_VOLUME,
-                BROKER_PERFORMANCE_ANALYSIS,
-                BROKER_ACTIVE
-            FROM INSURANCE_WORKSHOP_DB.ANALYTICS.BROKER_PERFORMANCE_MATRIX
-            WHERE BROKER_ACTIVE = TRUE
-            ORDER BY TOTAL_PREMIUM_VOLUME DESC
-        """).to_pandas()
+        # Broker performance frames use lowercase names, matching the UDF OBJECT keys
+        for key in ('broker_matrix', 'top_brokers'):
+            if key in results:
+                results[key] = results[key].rename(columns=str.lower)
         
         return results
         
@@ -191,27 +371,209 @@ def get_risk_analytics_data():
         st.error(f"Error fetching risk analytics data: {str(e)}")
         return {}
 
-def parse_broker_performance_analysis(performance_json):
-    """Parse Python UDF broker performance analysis results"""
-    try:
-        if isinstance(performance_json, str):
-            performance = json.loads(performance_json)
-        elif isinstance(performance_json, dict):
-            performance = performance_json
-        else:
-            return None
-        
-        return {
-            'total_score': performance.get('total_score', 0),
-            'performance_tier': performance.get('performance_tier', 'UNKNOWN'),
-            'satisfaction_component': performance.get('satisfaction_component', 0),
-            'experience_component': performance.get('experience_component', 0),
-            'training_component': performance.get('training_component', 0),
-            'portfolio_component': performance.get('portfolio_component', 0),
-            'risk_management_component': performance.get('risk_management_component', 0)
-        }
-    except:
-        return None
+# Figure caches keep a few recent builds (roles x current and previous data) and evict the rest
+FIGURE_CACHE_ENTRIES = 8
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_risk_level_pie(levels: tuple, counts: tuple) -> go.Figure:
+    """Customer risk level pie, cached on the aggregated counts"""
+    fig = go.Figure(go.Pie(
+        labels=levels,
+        values=counts,
+        marker_colors=[RISK_LEVEL_COLORS.get(level, COLORS['main']) for level in levels]
+    ))
+    fig.update_layout(title="Customer Risk Distribution (SQL UDF)")
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_broker_tier_bar(tiers: tuple, counts: tuple) -> go.Figure:
+    """Customers per broker tier bar chart, cached on the aggregated counts"""
+    fig = go.Figure(go.Bar(
+        x=tiers,
+        y=counts,
+        marker_color=[BROKER_TIER_COLORS.get(tier, COLORS['main']) for tier in tiers]
+    ))
+    fig.update_layout(
+        title="Broker Tier Distribution (SQL UDF)",
+        xaxis_title='Broker Tier',
+        yaxis_title='Number of Customers',
+        showlegend=False
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_component_bar(components: tuple, averages: tuple) -> go.Figure:
+    """Average Python UDF performance components, cached on the averages"""
+    fig = go.Figure(go.Bar(
+        x=averages,
+        y=components,
+        orientation='h',
+        marker=dict(
+            color=averages,
+            colorscale=PERFORMANCE_GRADIENT,
+            showscale=True
+        )
+    ))
+    fig.update_layout(
+        title="Average Performance Components (Python UDF)",
+        showlegend=False
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_performance_scatter(performance_df: pd.DataFrame) -> go.Figure:
+    """Python UDF performance score vs portfolio size, cached on the broker frame"""
+    fig = px.scatter(
+        performance_df,
+        x='total_customers',
+        y='total_score',
+        size='portfolio_component',
+        color='performance_tier',
+        hover_data=['broker_name'],
+        color_discrete_map=PERFORMANCE_TIER_COLORS,
+        render_mode='webgl',
+        title="Broker Performance Analysis (Python UDF)",
+        labels={'total_customers': 'Portfolio Size', 'total_score': 'Total Performance Score'}
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_segment_risk_scatter(segment_risk: pd.DataFrame) -> go.Figure:
+    """Segment risk scatter, cached on the segment rollup"""
+    fig = px.scatter(
+        segment_risk,
+        x='AVG_RISK_SCORE',
+        y='HIGH_RISK_COUNT',
+        size='CUSTOMER_COUNT',
+        color='CUSTOMER_SEGMENT',
+        render_mode='webgl',
+        title="Risk Profile by Customer Segment",
+        labels={'AVG_RISK_SCORE': 'Average Risk Score', 'HIGH_RISK_COUNT': 'High Risk Customer Count'}
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_portfolio_risk_box(broker_correlation: pd.DataFrame) -> go.Figure:
+    """Portfolio risk by broker tier, cached on the broker rollup"""
+    fig = px.box(
+        broker_correlation,
+        x='BROKER_TIER',
+        y='PORTFOLIO_RISK_SCORE',
+        color='BROKER_TIER',
+        color_discrete_map=BROKER_TIER_COLORS,
+        title="Portfolio Risk Distribution by Broker Tier"
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_size_risk_scatter(broker_correlation: pd.DataFrame) -> go.Figure:
+    """Portfolio size vs risk, cached on the broker rollup"""
+    fig = px.scatter(
+        broker_correlation,
+        x='BROKER_CUSTOMER_COUNT',
+        y='PORTFOLIO_RISK_SCORE',
+        size='TOTAL_PORTFOLIO_CLAIMS',
+        color='BROKER_TIER',
+        color_discrete_map=BROKER_TIER_COLORS,
+        render_mode='webgl',
+        title="Portfolio Size vs Risk Correlation",
+        labels={'BROKER_CUSTOMER_COUNT': 'Portfolio Size', 'PORTFOLIO_RISK_SCORE': 'Portfolio Risk Score'}
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_regional_risk_bar(geographic_data: pd.DataFrame) -> go.Figure:
+    """Average risk by region, cached on the geographic rollup"""
+    fig = px.bar(
+        geographic_data,
+        x='CUSTOMER_REGION',
+        y='REGION_AVG_RISK',
+        color='HIGH_RISK_COUNT',
+        color_continuous_scale=RISK_GRADIENT,
+        title="Average Risk Score by Region",
+        labels={'REGION_AVG_RISK': 'Average Risk Score', 'CUSTOMER_REGION': 'Region'}
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_density_risk_scatter(geographic_data: pd.DataFrame) -> go.Figure:
+    """Customer density vs regional risk, cached on the geographic rollup"""
+    fig = px.scatter(
+        geographic_data,
+        x='TOTAL_CUSTOMERS',
+        y='REGION_AVG_RISK',
+        size='REGION_TOTAL_CLAIMS',
+        color='ACTIVE_BROKERS',
+        hover_data=['CUSTOMER_REGION'],
+        color_continuous_scale=PERFORMANCE_GRADIENT,
+        render_mode='webgl',
+        title="Customer Density vs Regional Risk",
+        labels={'TOTAL_CUSTOMERS': 'Customer Count', 'REGION_AVG_RISK': 'Average Risk Score'}
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_age_risk_bar(age_distribution: pd.DataFrame) -> go.Figure:
+    """Age distribution by risk level, cached on the SQL-binned counts"""
+    fig = px.bar(
+        age_distribution,
+        x='AGE_BAND',
+        y='CUSTOMER_COUNT',
+        color='FINAL_RISK_LEVEL',
+        color_discrete_map=RISK_LEVEL_COLORS,
+        title="Age Distribution by Risk Level (SQL UDF)",
+        labels={'AGE_BAND': 'Customer Age (5-year bands)', 'CUSTOMER_COUNT': 'Number of Customers'},
+        opacity=0.7,
+        barmode='overlay'
+    )
+    # Adjacent band bars, matching the histogram look
+    fig.update_layout(bargap=0)
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_premium_risk_box(premium_quartiles: pd.DataFrame) -> go.Figure:
+    """Premium quartile boxes per risk level, cached on the SQL quartiles"""
+    fig = go.Figure([
+        go.Box(
+            name=row.FINAL_RISK_LEVEL,
+            x=[row.FINAL_RISK_LEVEL],
+            lowerfence=[row.MIN_PREMIUM],
+            q1=[row.Q1_PREMIUM],
+            median=[row.MEDIAN_PREMIUM],
+            q3=[row.Q3_PREMIUM],
+            upperfence=[row.MAX_PREMIUM],
+            marker_color=RISK_LEVEL_COLORS.get(row.FINAL_RISK_LEVEL, COLORS['main'])
+        )
+        for row in premium_quartiles.itertuples(index=False)
+    ])
+    fig.update_layout(
+        title="Premium Distribution by Risk Level",
+        xaxis_title='Risk Level',
+        yaxis_title='Annual Premium ($)',
+        showlegend=False
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def build_region_heatmap(risk_profiles: pd.DataFrame) -> go.Figure:
+    """Region vs segment risk heatmap fed the long-format rollup directly"""
+    fig = go.Figure(go.Heatmap(
+        x=risk_profiles['CUSTOMER_SEGMENT'].astype(str),
+        y=risk_profiles['CUSTOMER_REGION'].astype(str),
+        z=risk_profiles['AVG_RISK_SCORE'],
+        colorscale=RISK_GRADIENT,
+        colorbar=dict(title='Risk Score')
+    ))
+    fig.update_layout(title="Risk Score Heatmap: Region vs Segment")
+    return fig
+
+@st.fragment(run_every=60)
+def auto_refresh_timer():
+    """Rerun the full app on each timer tick; the call made during a full run only arms it"""
+    if st.session_state.get('auto_refresh_due'):
+        st.rerun()
+    st.session_state['auto_refresh_due'] = True
 
 # Dashboard Header
 st.markdown('<div class="main-header">Insurance Workshop - Risk Analytics Intelligence</div>', 
@@ -227,13 +589,22 @@ with col3:
         st.cache_data.clear()
         st.rerun()
 
-# Auto-refresh logic
+# Auto-refresh logic: a timer fragment reruns the app without blocking the script thread
 if auto_refresh:
-    time.sleep(60)
-    st.rerun()
+    st.session_state['auto_refresh_due'] = False
+    auto_refresh_timer()
 
-# Fetch data
-risk_data = get_risk_analytics_data()
+# Fetch data; the session role is resolved once per browser session
+if 'current_role' not in st.session_state:
+    st.session_state['current_role'] = session.get_current_role()
+data_watermark = get_data_watermark()
+if data_watermark is None:
+    # Without the probe, fall back to refetching once per minute and say so once per session
+    data_watermark = datetime.now().strftime('%Y-%m-%d %H:%M')
+    if not st.session_state.get('watermark_fallback_noted'):
+        st.session_state['watermark_fallback_noted'] = True
+        st.warning("Dynamic Table refresh times are unavailable for this role; analytics will be refetched every minute.")
+risk_data = get_risk_analytics_data(data_watermark, st.session_state['current_role'])
 
 if not risk_data:
     st.error("Unable to load risk analytics data. Please check your session context.")
@@ -242,182 +613,100 @@ if not risk_data:
 # Risk Overview Dashboard
 st.markdown('<div class="section-header">Risk Overview Dashboard</div>', unsafe_allow_html=True)
 
-if 'risk_dashboard' in risk_data and not risk_data['risk_dashboard'].empty:
-    dashboard_data = risk_data['risk_dashboard']
+if 'risk_overview' in risk_data and not risk_data['risk_overview'].empty:
+    overview = risk_data['risk_overview'].iloc[0]
     
-    # Overall risk metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        total_customers = len(dashboard_data)
-        st.markdown(f"""
-        <div class="metric-card">
-            <h4 style="color: {COLORS['mid_blue']}; margin: 0;">Total Customers</h4>
-            <h2 style="color: {COLORS['midnight']}; margin: 10px 0;">{total_customers:,}</h2>
-            <p style="color: {COLORS['medium_gray']}; margin: 0;">Under risk analysis</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Risk level counts from the overview row, shared by the overview cards and UDF charts
+    risk_level_counts = pd.Series({level: int(overview[f'{level}_RISK_COUNT']) for level in RISK_LEVEL_COLORS})
     
-    with col2:
-        high_risk_count = len(dashboard_data[dashboard_data['FINAL_RISK_LEVEL'] == 'HIGH'])
-        high_risk_pct = (high_risk_count / total_customers) * 100 if total_customers > 0 else 0
-        st.markdown(f"""
-        <div class="metric-card">
-            <h4 style="color: {COLORS['mid_blue']}; margin: 0;">High Risk Customers</h4>
-            <h2 style="color: {COLORS['first_light']}; margin: 10px 0;">{high_risk_count:,}</h2>
-            <p style="color: {COLORS['medium_gray']}; margin: 0;">{high_risk_pct:.1f}% of portfolio</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        avg_risk_score = dashboard_data['CUSTOMER_RISK_SCORE'].mean()
-        risk_color = COLORS['first_light'] if avg_risk_score > 60 else COLORS['valencia_orange'] if avg_risk_score > 40 else COLORS['star_blue']
-        st.markdown(f"""
-        <div class="metric-card">
-            <h4 style="color: {COLORS['mid_blue']}; margin: 0;">Average Risk Score</h4>
-            <h2 style="color: {risk_color}; margin: 10px 0;">{avg_risk_score:.1f}</h2>
-            <p style="color: {COLORS['medium_gray']}; margin: 0;">SQL UDF calculation</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Overall risk metrics, emitted as one card grid
+    total_customers = int(overview['TOTAL_CUSTOMERS'])
+    high_risk_count = int(risk_level_counts['HIGH'])
+    high_risk_pct = (high_risk_count / total_customers) * 100 if total_customers > 0 else 0
+    avg_risk_score = overview['AVG_RISK_SCORE'] if total_customers > 0 else 0
+    risk_color = COLORS['first_light'] if avg_risk_score > 60 else COLORS['valencia_orange'] if avg_risk_score > 40 else COLORS['star_blue']
+    total_exposure = overview['TOTAL_EXPOSURE'] if total_customers > 0 else 0
     
-    with col4:
-        total_exposure = dashboard_data['CLAIM_AMOUNT_FILLED'].sum()
-        st.markdown(f"""
-        <div class="metric-card">
-            <h4 style="color: {COLORS['mid_blue']}; margin: 0;">Total Exposure</h4>
-            <h2 style="color: {COLORS['purple_moon']}; margin: 10px 0;">${total_exposure:,.0f}</h2>
-            <p style="color: {COLORS['medium_gray']}; margin: 0;">Claims exposure</p>
-        </div>
-        """, unsafe_allow_html=True)
+    overview_cards = [
+        ('Total Customers', f"{total_customers:,}", COLORS['midnight'], 'Under risk analysis'),
+        ('High Risk Customers', f"{high_risk_count:,}", COLORS['first_light'], f"{high_risk_pct:.1f}% of portfolio"),
+        ('Average Risk Score', f"{avg_risk_score:.1f}", risk_color, 'SQL UDF calculation'),
+        # &#36; keeps Streamlit from treating the dollar sign as a LaTeX delimiter
+        ('Total Exposure', f"&#36;{total_exposure:,.0f}", COLORS['purple_moon'], 'Claims exposure')
+    ]
+    metric_cards = "".join(
+        f'<div class="metric-card">'
+        f'<h4 style="color: {COLORS["mid_blue"]}; margin: 0;">{title}</h4>'
+        f'<h2 style="color: {value_color}; margin: 10px 0;">{value}</h2>'
+        f'<p style="color: {COLORS["medium_gray"]}; margin: 0;">{caption}</p>'
+        f'</div>'
+        for title, value, value_color, caption in overview_cards
+    )
+    st.markdown(f'<div class="card-grid">{metric_cards}</div>', unsafe_allow_html=True)
 
 # UDF Results Analysis
 st.markdown('<div class="section-header">UDF-Driven Analytics</div>', unsafe_allow_html=True)
 
-st.markdown(f"""
-<div class="udf-analysis">
-<strong>Mixed UDF Architecture:</strong> This dashboard showcases both SQL UDFs (CALCULATE_CUSTOMER_RISK_SCORE, DETERMINE_BROKER_TIER) 
-and Python UDFs (ANALYZE_BROKER_PERFORMANCE) working together in Dynamic Tables for real-time analytics.
-</div>
-""", unsafe_allow_html=True)
+st.markdown(STATIC_HTML['udf_note'], unsafe_allow_html=True)
 
-if 'risk_dashboard' in risk_data and not risk_data['risk_dashboard'].empty:
+if 'risk_overview' in risk_data and not risk_data['risk_overview'].empty:
     col1, col2 = st.columns(2)
     
     with col1:
         # Customer Risk Score Distribution (SQL UDF)
-        risk_levels = dashboard_data['FINAL_RISK_LEVEL'].value_counts()
-        fig_risk_dist = px.pie(
-            values=risk_levels.values,
-            names=risk_levels.index,
-            color_discrete_map={
-                'HIGH': COLORS['first_light'],
-                'MEDIUM': COLORS['valencia_orange'],
-                'LOW': COLORS['star_blue']
-            },
-            title="Customer Risk Distribution (SQL UDF)"
-        )
-        fig_risk_dist.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400
-        )
-        st.plotly_chart(fig_risk_dist, use_container_width=True)
+        fig_risk_dist = build_risk_level_pie(tuple(risk_level_counts.index), tuple(risk_level_counts.tolist()))
+        st.plotly_chart(fig_risk_dist, use_container_width=True, theme=None)
     
     with col2:
-        # Broker Tier Distribution (SQL UDF)
-        broker_tiers = dashboard_data['BROKER_TIER'].value_counts()
-        fig_broker_tiers = px.bar(
-            x=broker_tiers.index,
-            y=broker_tiers.values,
-            color=broker_tiers.index,
-            color_discrete_map={
-                'PLATINUM': COLORS['purple_moon'],
-                'GOLD': COLORS['valencia_orange'],
-                'SILVER': COLORS['medium_gray'],
-                'BRONZE': COLORS['first_light']
-            },
-            title="Broker Tier Distribution (SQL UDF)",
-            labels={'x': 'Broker Tier', 'y': 'Number of Customers'}
-        )
-        fig_broker_tiers.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400,
-            showlegend=False
-        )
-        st.plotly_chart(fig_broker_tiers, use_container_width=True)
+        # Broker Tier Distribution (SQL UDF), counted in Snowflake
+        if 'tier_distribution' in risk_data:
+            broker_tiers = risk_data['tier_distribution']
+            fig_broker_tiers = build_broker_tier_bar(
+                tuple(broker_tiers['BROKER_TIER']), tuple(broker_tiers['CUSTOMER_COUNT'].tolist())
+            )
+            st.plotly_chart(fig_broker_tiers, use_container_width=True, theme=None)
 
 # Python UDF Broker Performance Analysis
 st.markdown('<div class="section-header">Python UDF Broker Performance Analysis</div>', unsafe_allow_html=True)
 
+performance_df = pd.DataFrame()
 if 'broker_matrix' in risk_data and not risk_data['broker_matrix'].empty:
-    broker_matrix = risk_data['broker_matrix']
+    # Python UDF results arrive already flattened into columns by the broker_matrix query
+    performance_df = risk_data['broker_matrix']
     
-    # Parse Python UDF results
-    performance_analyses = []
-    for idx, row in broker_matrix.iterrows():
-        if pd.notna(row['BROKER_PERFORMANCE_ANALYSIS']):
-            parsed = parse_broker_performance_analysis(row['BROKER_PERFORMANCE_ANALYSIS'])
-            if parsed:
-                parsed['broker_id'] = row['BROKER_ID']
-                parsed['broker_name'] = f"{row['BROKER_FIRST_NAME']} {row['BROKER_LAST_NAME']}"
-                parsed['total_customers'] = row['TOTAL_CUSTOMERS']
-                performance_analyses.append(parsed)
+    col1, col2 = st.columns(2)
     
-    if performance_analyses:
-        performance_df = pd.DataFrame(performance_analyses)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Performance Score vs Customer Count
-            fig_performance = px.scatter(
-                performance_df,
-                x='total_customers',
-                y='total_score',
-                size='portfolio_component',
-                color='performance_tier',
-                hover_data=['broker_name'],
-                color_discrete_map={
-                    'ELITE': COLORS['purple_moon'],
-                    'SUPERIOR': COLORS['star_blue'],
-                    'PROFICIENT': COLORS['valencia_orange'],
-                    'DEVELOPING': COLORS['first_light']
-                },
-                title="Broker Performance Analysis (Python UDF)",
-                labels={'total_customers': 'Portfolio Size', 'total_score': 'Total Performance Score'}
-            )
-            fig_performance.update_layout(
-                title_font_color=COLORS['mid_blue'],
-                height=400
-            )
-            st.plotly_chart(fig_performance, use_container_width=True)
-        
-        with col2:
-            # Performance Component Breakdown
-            component_cols = ['satisfaction_component', 'experience_component', 'training_component', 
-                            'portfolio_component', 'risk_management_component']
-            avg_components = performance_df[component_cols].mean()
-            
-            fig_components = px.bar(
-                x=avg_components.values,
-                y=[col.replace('_component', '').title() for col in avg_components.index],
-                orientation='h',
-                color=avg_components.values,
-                color_continuous_scale=[[0, COLORS['first_light']], [0.5, COLORS['valencia_orange']], [1, COLORS['star_blue']]],
-                title="Average Performance Components (Python UDF)"
-            )
-            fig_components.update_layout(
-                title_font_color=COLORS['mid_blue'],
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig_components, use_container_width=True)
+    with col1:
+        # Performance Score vs Customer Count
+        fig_performance = build_performance_scatter(performance_df)
+        st.plotly_chart(fig_performance, use_container_width=True, theme=None)
+    
+    with col2:
+        # Performance Component Breakdown
+        component_cols = ['satisfaction_component', 'experience_component', 'training_component', 
+                        'portfolio_component', 'risk_management_component']
+        avg_components = performance_df[component_cols].mean()
         
-        # Top performing brokers table
+        fig_components = build_component_bar(
+            tuple(col.replace('_component', '').title() for col in avg_components.index),
+            tuple(avg_components.tolist())
+        )
+        st.plotly_chart(fig_components, use_container_width=True, theme=None)
+    
+    # Top performing brokers table
+    if 'top_brokers' in risk_data:
         st.markdown("**Top Performing Brokers (Python UDF Analysis)**")
-        top_brokers = performance_df.nlargest(10, 'total_score')[
-            ['broker_name', 'performance_tier', 'total_score', 'total_customers']
-        ].round(1)
-        st.dataframe(top_brokers, use_container_width=True)
+        st.dataframe(
+            risk_data['top_brokers'],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'broker_name': 'Broker',
+                'performance_tier': 'Performance Tier',
+                'total_score': st.column_config.NumberColumn('Total Score', format='%.1f'),
+                'total_customers': st.column_config.NumberColumn('Customers', format='%d')
+            }
+        )
 
 # Multi-dimensional Risk Analysis
 st.markdown('<div class="section-header">Multi-dimensional Risk Analysis</div>', unsafe_allow_html=True)
@@ -428,52 +717,17 @@ if 'risk_profiles' in risk_data and not risk_data['risk_profiles'].empty:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Customer segment risk distribution
-        segment_risk = risk_profiles.groupby('CUSTOMER_SEGMENT').agg({
-            'CUSTOMER_COUNT': 'sum',
-            'AVG_RISK_SCORE': 'mean',
-            'HIGH_RISK_COUNT': 'sum'
-        }).reset_index()
-        
-        fig_segment_risk = px.scatter(
-            segment_risk,
-            x='AVG_RISK_SCORE',
-            y='HIGH_RISK_COUNT',
-            size='CUSTOMER_COUNT',
-            color='CUSTOMER_SEGMENT',
-            color_discrete_sequence=[COLORS['main'], COLORS['star_blue'], COLORS['valencia_orange']],
-            title="Risk Profile by Customer Segment",
-            labels={'AVG_RISK_SCORE': 'Average Risk Score', 'HIGH_RISK_COUNT': 'High Risk Customer Count'}
-        )
-        fig_segment_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400
-        )
-        st.plotly_chart(fig_segment_risk, use_container_width=True)
+        # Customer segment risk distribution, rolled up in Snowflake
+        if 'segment_rollup' in risk_data:
+            segment_risk = risk_data['segment_rollup']
+            
+            fig_segment_risk = build_segment_risk_scatter(segment_risk)
+            st.plotly_chart(fig_segment_risk, use_container_width=True, theme=None)
     
     with col2:
         # Regional risk heatmap
-        region_pivot = risk_profiles.pivot_table(
-            index='CUSTOMER_REGION',
-            columns='CUSTOMER_SEGMENT',
-            values='AVG_RISK_SCORE',
-            fill_value=0
-        )
-        
-        if not region_pivot.empty:
-            fig_heatmap = px.imshow(
-                region_pivot.values,
-                x=region_pivot.columns,
-                y=region_pivot.index,
-                color_continuous_scale=[[0, COLORS['star_blue']], [0.5, COLORS['valencia_orange']], [1, COLORS['first_light']]],
-                title="Risk Score Heatmap: Region vs Segment",
-                labels={'color': 'Risk Score'}
-            )
-            fig_heatmap.update_layout(
-                title_font_color=COLORS['mid_blue'],
-                height=400
-            )
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+        fig_heatmap = build_region_heatmap(risk_profiles)
+        st.plotly_chart(fig_heatmap, use_container_width=True, theme=None)
 
 # Broker-Customer Risk Correlation
 st.markdown('<div class="section-header">Broker-Customer Risk Correlation</div>', unsafe_allow_html=True)
@@ -485,48 +739,13 @@ if 'broker_correlation' in risk_data and not risk_data['broker_correlation'].emp
     
     with col1:
         # Broker tier vs portfolio risk
-        fig_broker_risk = px.box(
-            broker_correlation,
-            x='BROKER_TIER',
-            y='PORTFOLIO_RISK_SCORE',
-            color='BROKER_TIER',
-            color_discrete_map={
-                'PLATINUM': COLORS['purple_moon'],
-                'GOLD': COLORS['valencia_orange'],
-                'SILVER': COLORS['medium_gray'],
-                'BRONZE': COLORS['first_light']
-            },
-            title="Portfolio Risk Distribution by Broker Tier"
-        )
-        fig_broker_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400,
-            showlegend=False
-        )
-        st.plotly_chart(fig_broker_risk, use_container_width=True)
+        fig_broker_risk = build_portfolio_risk_box(broker_correlation)
+        st.plotly_chart(fig_broker_risk, use_container_width=True, theme=None)
     
     with col2:
         # Portfolio size vs risk correlation
-        fig_size_risk = px.scatter(
-            broker_correlation,
-            x='BROKER_CUSTOMER_COUNT',
-            y='PORTFOLIO_RISK_SCORE',
-            size='TOTAL_PORTFOLIO_CLAIMS',
-            color='BROKER_TIER',
-            color_discrete_map={
-                'PLATINUM': COLORS['purple_moon'],
-                'GOLD': COLORS['valencia_orange'],
-                'SILVER': COLORS['medium_gray'],
-                'BRONZE': COLORS['first_light']
-            },
-            title="Portfolio Size vs Risk Correlation",
-            labels={'BROKER_CUSTOMER_COUNT': 'Portfolio Size', 'PORTFOLIO_RISK_SCORE': 'Portfolio Risk Score'}
-        )
-        fig_size_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400
-        )
-        st.plotly_chart(fig_size_risk, use_container_width=True)
+        fig_size_risk = build_size_risk_scatter(broker_correlation)
+        st.plotly_chart(fig_size_risk, use_container_width=True, theme=None)
 
 # Geographic Risk Analysis
 st.markdown('<div class="section-header">Geographic Risk Distribution</div>', unsafe_allow_html=True)
@@ -538,91 +757,29 @@ if 'geographic_risk' in risk_data and not risk_data['geographic_risk'].empty:
     
     with col1:
         # Regional risk comparison
-        fig_regional_risk = px.bar(
-            geographic_data,
-            x='CUSTOMER_REGION',
-            y='REGION_AVG_RISK',
-            color='HIGH_RISK_COUNT',
-            color_continuous_scale=[[0, COLORS['star_blue']], [0.5, COLORS['valencia_orange']], [1, COLORS['first_light']]],
-            title="Average Risk Score by Region",
-            labels={'REGION_AVG_RISK': 'Average Risk Score', 'CUSTOMER_REGION': 'Region'}
-        )
-        fig_regional_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400
-        )
-        st.plotly_chart(fig_regional_risk, use_container_width=True)
+        fig_regional_risk = build_regional_risk_bar(geographic_data)
+        st.plotly_chart(fig_regional_risk, use_container_width=True, theme=None)
     
     with col2:
         # Risk vs customer density
-        fig_density_risk = px.scatter(
-            geographic_data,
-            x='TOTAL_CUSTOMERS',
-            y='REGION_AVG_RISK',
-            size='REGION_TOTAL_CLAIMS',
-            color='ACTIVE_BROKERS',
-            hover_data=['CUSTOMER_REGION'],
-            color_continuous_scale=[[0, COLORS['first_light']], [0.5, COLORS['valencia_orange']], [1, COLORS['star_blue']]],
-            title="Customer Density vs Regional Risk",
-            labels={'TOTAL_CUSTOMERS': 'Customer Count', 'REGION_AVG_RISK': 'Average Risk Score'}
-        )
-        fig_density_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400
-        )
-        st.plotly_chart(fig_density_risk, use_container_width=True)
+        fig_density_risk = build_density_risk_scatter(geographic_data)
+        st.plotly_chart(fig_density_risk, use_container_width=True, theme=None)
 
 # Risk Factor Analysis
 st.markdown('<div class="section-header">Risk Factor Analysis</div>', unsafe_allow_html=True)
 
-if 'risk_dashboard' in risk_data and not risk_data['risk_dashboard'].empty:
-    dashboard_data = risk_data['risk_dashboard']
-    
+if 'age_distribution' in risk_data and 'premium_quartiles' in risk_data:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Age vs Risk correlation - using histogram for WebGL compatibility
-        fig_age_risk = px.histogram(
-            dashboard_data,
-            x='AGE',
-            color='FINAL_RISK_LEVEL',
-            color_discrete_map={
-                'HIGH': COLORS['first_light'],
-                'MEDIUM': COLORS['valencia_orange'],
-                'LOW': COLORS['star_blue']
-            },
-            title="Age Distribution by Risk Level (SQL UDF)",
-            labels={'AGE': 'Customer Age', 'count': 'Number of Customers'},
-            opacity=0.7
-        )
-        fig_age_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400,
-            barmode='overlay'
-        )
-        st.plotly_chart(fig_age_risk, use_container_width=True)
+        # Age vs Risk correlation from age-band counts binned in Snowflake
+        fig_age_risk = build_age_risk_bar(risk_data['age_distribution'])
+        st.plotly_chart(fig_age_risk, use_container_width=True, theme=None)
     
     with col2:
-        # Premium vs Risk analysis using box plot for WebGL compatibility
-        fig_premium_risk = px.box(
-            dashboard_data,
-            x='FINAL_RISK_LEVEL',
-            y='POLICY_ANNUAL_PREMIUM',
-            color='FINAL_RISK_LEVEL',
-            color_discrete_map={
-                'HIGH': COLORS['first_light'],
-                'MEDIUM': COLORS['valencia_orange'],
-                'LOW': COLORS['star_blue']
-            },
-            title="Premium Distribution by Risk Level",
-            labels={'FINAL_RISK_LEVEL': 'Risk Level', 'POLICY_ANNUAL_PREMIUM': 'Annual Premium ($)'}
-        )
-        fig_premium_risk.update_layout(
-            title_font_color=COLORS['mid_blue'],
-            height=400,
-            showlegend=False
-        )
-        st.plotly_chart(fig_premium_risk, use_container_width=True)
+        # Premium vs Risk analysis from quartiles computed in Snowflake
+        fig_premium_risk = build_premium_risk_box(risk_data['premium_quartiles'])
+        st.plotly_chart(fig_premium_risk, use_container_width=True, theme=None)
 
 # Analytics Summary
 st.markdown('<div class="section-header">Analytics Summary</div>', unsafe_allow_html=True)
@@ -646,16 +803,10 @@ if risk_data:
             st.metric("Customer Segments", segments_analyzed)
     
     with col4:
-        if performance_analyses:
-            udf_calculations = len(performance_analyses)
+        if not performance_df.empty:
+            udf_calculations = len(performance_df)
             st.metric("Python UDF Results", udf_calculations)
 
 # Footer
 st.markdown("---")
-st.markdown(f"""
-<div style='text-align: center; color: {COLORS['medium_gray']}; padding: 20px;'>
-    <p><strong>Insurance Workshop - Risk Analytics Intelligence Dashboard</strong></p>
-    <p>Powered by Snowflake Dynamic Tables, SQL UDFs, and Python UDFs</p>
-    <p>UDF-Driven Analytics • Geographic Intelligence • Broker Performance • Real-time Insights</p>
-</div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+st.markdown(STATIC_HTML['footer'], unsafe_allow_html=True)